@@ -5,7 +5,6 @@ import time
 from argparse import ArgumentParser
 
 import duckdb
-import matplotlib.pyplot as plt
 import numpy as np
 import pyarrow.parquet as pq
 
@@ -35,11 +34,10 @@ def add_percentage(read_avg, sort_res):
     return
 
 
-# Calculate the percentile of the value in the array
-def _calculate_percentile(arr, value):
-    arr.sort()
-    index = np.searchsorted(arr, value)
-    percentile = index / len(arr)
+# Calculate the percentile of the value in the sorted array
+def _calculate_percentile(sorted_arr, value):
+    index = np.searchsorted(sorted_arr, value)
+    percentile = index / sorted_arr.size
     return percentile
 
 
@@ -73,22 +71,25 @@ def benchmark(discription, attr_num, benchmark_func, warmup, iterations, *args):
     for i in range(warmup):
         benchmark_func(*args)
 
-    times = []
+    times = np.empty(iterations, dtype=np.int64)
     for i in range(iterations):
-        start = time.perf_counter() * 1000
+        start = time.perf_counter_ns()
         res = benchmark_func(*args)
-        end = time.perf_counter() * 1000
-        times.append(end - start)
-
-    times = np.array(times)
-    min_time = np.min(times)
-    max_time = np.max(times)
+        end = time.perf_counter_ns()
+        times[i] = end - start
+
+    # Convert to ms once, outside the timed region
+    times = times / 1e6
+    # Sort once and derive the order statistics from it
+    times_sorted = np.sort(times)
+    min_time = times_sorted[0]
+    max_time = times_sorted[-1]
     avg_time = np.mean(times)
-    median_time = np.median(times)
+    median_time = np.median(times_sorted)
     std_time = np.std(times)
 
     # Calculate the percentiles for the average
-    avg_percentile = _calculate_percentile(times, avg_time)
+    avg_percentile = _calculate_percentile(times_sorted, avg_time)
 
     print(f"Benchmark {discription} finished. Avg time: {avg_time} ms.")
     # Return a dictionary
@@ -239,6 +240,9 @@ def plot_res(res, file_name=None):
                 "The result does not contain the ratio attribute,use add_percentage() first."
             )
             return
+    # Imported lazily, matplotlib setup is slow and only needed for plotting
+    import matplotlib.pyplot as plt
+
     attr_counts = []
     ratios = []
     # Clear previous plot
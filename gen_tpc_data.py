@@ -7,19 +7,48 @@ from argparse import ArgumentParser
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 data_dir = os.path.join(root_dir, "data")
+# Rows fetched from DuckDB per Arrow batch, also the Parquet row group size
+rows_per_batch = 1024 * 1024
+# Only used to detect an already complete output dir, dbgen owns the tables
+tpch_tables = [
+    "customer",
+    "lineitem",
+    "nation",
+    "orders",
+    "part",
+    "partsupp",
+    "region",
+    "supplier",
+]
 
 
 def parse_args():
     parser = ArgumentParser(description="Generate TPC-H/TPC-DS data.")
     parser.add_argument("-s", "--scale-factor", type=int, required=True)
     parser.add_argument("-d", "--dataset", default="tpch", choices=["tpch", "tpcds"])
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Overwrite existing files instead of reusing them.",
+    )
     return parser.parse_args()
 
 
 def gen_tpch(args):
     scale_factor = args.scale_factor
     output_dir = os.path.join(data_dir, "tpch", f"s{scale_factor}")
-    os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    # Resume a previous run by reusing its files, unless --force is given
+    if not args.force and all(
+        os.path.exists(os.path.join(output_dir, f"{table_name}.parquet"))
+        for table_name in tpch_tables
+    ):
+        print(
+            f"TPC-H data with SF={scale_factor} already exists in {output_dir}, "
+            "use --force to regenerate it."
+        )
+        return
     print(f"Generating TPC-H data with SF={scale_factor}, output dir is {output_dir}")
     con = duckdb.connect(database=":memory:")
     con.execute("INSTALL tpch; LOAD tpch")
@@ -27,9 +56,26 @@ def gen_tpch(args):
     for table in con.execute("show tables").fetchall():
         table_name = table[0]
         parquet_path = os.path.join(output_dir, f"{table_name}.parquet")
+        if not args.force and os.path.exists(parquet_path):
+            print(f"reuse existing {parquet_path}")
+            continue
         print(f"write to {parquet_path}")
-        res = con.query(f"SELECT * FROM {table_name}")
-        pq.write_table(res.to_arrow_table(), parquet_path)
+        # Stream record batches into the writer instead of materializing the
+        # whole table as Arrow first, which doubles peak memory on large SFs
+        reader = con.execute(f"SELECT * FROM {table_name}").fetch_record_batch(
+            rows_per_batch
+        )
+        # Write to a temporary file so an interrupted run is not reused later
+        tmp_path = f"{parquet_path}.tmp"
+        try:
+            with pq.ParquetWriter(tmp_path, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch, row_group_size=rows_per_batch)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, parquet_path)
 
 
 if __name__ == "__main__":